@@ -0,0 +1,312 @@
+# distutils: language = c++
+# cython: language_level=3
+"""Compiled version of the `format_edgelist` pipeline for edgelists with integer node ids and weights.
+`format_for_reneel` uses this when the extension has been built and falls back to the python/numpy
+reader otherwise (e.g. float weights, string node ids, or no C++ compiler at install time).
+
+The whole file is processed in a single pass with the GIL released: lines are read with `getline`,
+parsed with `strtoll`, and nodes and edges are aggregated in open-addressing hash tables (in the
+style of khash). Nodes are numbered in the order they were first seen, and each edge is keyed by
+`(i << 32) | j` for node numbers i, j."""
+import os
+
+from libc cimport errno
+from libc.stdint cimport int64_t, uint64_t
+from libc.stdio cimport FILE, fopen, fclose, fprintf
+from libc.stdlib cimport strtoll, malloc, free
+from libc.string cimport memset
+from libcpp.algorithm cimport sort
+from libcpp.pair cimport pair
+from libcpp.vector cimport vector
+
+cdef extern from "<stdio.h>" nogil:
+    ssize_t getline(char **lineptr, size_t *n, FILE *stream)
+
+# outcome of parsing one line
+cdef enum:
+    LINE_OK
+    LINE_BLANK
+    LINE_BAD_VALUE
+    LINE_TOO_SHORT
+    LINE_OUT_OF_RANGE
+
+
+cdef struct Table:
+    # linear probing hash table from uint64 keys to non-negative int64 values;
+    # a negative value marks an empty slot
+    uint64_t *keys
+    int64_t *values
+    size_t mask
+    size_t size
+
+
+cdef inline uint64_t _hash(uint64_t x) noexcept nogil:
+    # splitmix64 finalizer
+    x ^= x >> 33
+    x *= 0xff51afd7ed558ccdULL
+    x ^= x >> 33
+    x *= 0xc4ceb9fe1a85ec53ULL
+    x ^= x >> 33
+    return x
+
+
+cdef bint _table_init(Table *table, size_t capacity) noexcept nogil:
+    """Allocate an empty table with `capacity` (a power of 2) slots. Returns False if out of memory"""
+    table.keys = <uint64_t *>malloc(capacity * sizeof(uint64_t))
+    table.values = <int64_t *>malloc(capacity * sizeof(int64_t))
+    table.mask = capacity - 1
+    table.size = 0
+    if table.keys == NULL or table.values == NULL:
+        return False
+    memset(table.values, 0xFF, capacity * sizeof(int64_t))
+    return True
+
+
+cdef void _table_free(Table *table) noexcept nogil:
+    free(table.keys)
+    free(table.values)
+
+
+cdef int64_t *_table_slot(Table *table, uint64_t key) noexcept nogil:
+    """Find the value slot for `key`, claiming an empty one (value -1) if the key is new.
+    Grows the table to keep it at most half full. Returns NULL if out of memory"""
+    cdef size_t i, old_capacity
+    cdef Table old
+    if 2 * (table.size + 1) > table.mask + 1:
+        old = table[0]
+        old_capacity = old.mask + 1
+        if not _table_init(table, 2 * old_capacity):
+            _table_free(table)
+            table[0] = old
+            return NULL
+        for i in range(old_capacity):
+            if old.values[i] >= 0:
+                _table_slot(table, old.keys[i])[0] = old.values[i]
+        _table_free(&old)
+    i = _hash(key) & table.mask
+    while table.values[i] >= 0:
+        if table.keys[i] == key:
+            return &table.values[i]
+        i = (i + 1) & table.mask
+    table.keys[i] = key
+    table.size += 1
+    return &table.values[i]
+
+
+cdef inline bint _is_space(char c) noexcept nogil:
+    return c == b' ' or c == b'\t' or c == b'\n' or c == b'\r'
+
+
+cdef int _parse_line(char *line, char sep, int u_col, int v_col, int w_col,
+                     int64_t *u, int64_t *v, int64_t *w) noexcept nogil:
+    """Split `line` at `sep` (or at runs of whitespace if `sep` is 0) and parse the u, v, w columns"""
+    cdef char *p = line
+    cdef char *end
+    cdef int col = 0
+    cdef int last_col = max(u_col, max(v_col, w_col))
+    cdef int64_t value
+    cdef bint bad_value = False
+    while _is_space(p[0]):
+        p += 1
+    if p[0] == 0:
+        return LINE_BLANK
+    while col <= last_col:
+        if sep == 0:
+            while _is_space(p[0]):
+                p += 1
+        if p[0] == 0:
+            return LINE_TOO_SHORT
+        if col == u_col or col == v_col or col == w_col:
+            # strtoll saturates at the int64 limits, so check errno to tell overflow apart
+            errno.errno = 0
+            value = strtoll(p, &end, 10)
+            if errno.errno == errno.ERANGE:
+                return LINE_OUT_OF_RANGE
+            if sep != 0:
+                while end[0] == b' ' or end[0] == b'\t':
+                    end += 1
+            if end == p or not (end[0] == sep or _is_space(end[0]) or end[0] == 0):
+                # not an integer; keep going to check the line has enough columns
+                bad_value = True
+            else:
+                p = end
+                if col == u_col:
+                    u[0] = value
+                if col == v_col:
+                    v[0] = value
+                if col == w_col:
+                    w[0] = value
+        while p[0] != 0 and not (p[0] == sep if sep != 0 else _is_space(p[0])):
+            p += 1
+        if sep != 0:
+            if p[0] == sep:
+                p += 1
+            elif col < last_col:
+                return LINE_TOO_SHORT
+        col += 1
+    return LINE_BAD_VALUE if bad_value else LINE_OK
+
+
+def format_edgelist(path_in, edges_out, key_out, info_out, degree_out,
+                    sep=None, int skip=0, bint directed=False,
+                    int u_col=0, int v_col=1, int w_col=2):
+    """Read the edgelist `path_in` and write the clean_, key_, info_ and degree_ files,
+    exactly as `format_for_reneel` does. `sep=None` splits at whitespace.
+
+    Returns (number of nodes, number of edges, number of lines skipped because
+    they could not be parsed as integers). Raises `ValueError` if a line has too few columns,
+    and `OverflowError` if a value does not fit in 64 bits."""
+    cdef bytes b_in = os.fsencode(path_in)
+    cdef char c_sep = 0 if sep is None else ord(sep)
+    cdef FILE *source = fopen(b_in, "r")
+    if source == NULL:
+        raise FileNotFoundError(path_in)
+
+    cdef Table position, edge_position
+    cdef int64_t *slot
+    cdef bint out_of_memory = False
+    cdef vector[int64_t] node_ids, strength, degree
+    cdef vector[uint64_t] edge_keys
+    cdef vector[int64_t] edge_weights
+
+    cdef char *line = NULL
+    cdef size_t capacity = 0
+    cdef int64_t lineno = 0, bad_lines = 0, short_line = 0, overflow_line = 0
+    cdef int64_t u, v, w, i, j, tmp
+    cdef int status
+    cdef uint64_t key, low_bits = 0xFFFFFFFF
+
+    # initialise both before checking, so both can be freed either way
+    cdef bint nodes_ok = _table_init(&position, 1024)
+    cdef bint edges_ok = _table_init(&edge_position, 1024)
+    if not (nodes_ok and edges_ok):
+        fclose(source)
+        _table_free(&position)
+        _table_free(&edge_position)
+        raise MemoryError()
+    with nogil:
+        while getline(&line, &capacity, source) != -1:
+            lineno += 1
+            if lineno <= skip:
+                continue
+            status = _parse_line(line, c_sep, u_col, v_col, w_col, &u, &v, &w)
+            if status == LINE_BLANK:
+                continue
+            if status == LINE_TOO_SHORT:
+                short_line = lineno
+                break
+            if status == LINE_OUT_OF_RANGE:
+                overflow_line = lineno
+                break
+            if status == LINE_BAD_VALUE:
+                bad_lines += 1
+                continue
+            if u == v:
+                continue
+            if not directed and u < v:
+                tmp = u
+                u = v
+                v = tmp
+
+            slot = _table_slot(&position, <uint64_t>u)
+            if slot == NULL:
+                out_of_memory = True
+                break
+            if slot[0] < 0:
+                slot[0] = node_ids.size()
+                node_ids.push_back(u)
+                strength.push_back(0)
+                degree.push_back(0)
+            i = slot[0]
+            slot = _table_slot(&position, <uint64_t>v)
+            if slot == NULL:
+                out_of_memory = True
+                break
+            if slot[0] < 0:
+                slot[0] = node_ids.size()
+                node_ids.push_back(v)
+                strength.push_back(0)
+                degree.push_back(0)
+            j = slot[0]
+
+            strength[i] += w
+            strength[j] += w
+            degree[i] += 1
+            degree[j] += 1
+            key = (<uint64_t>i << 32) | <uint64_t>j
+            slot = _table_slot(&edge_position, key)
+            if slot == NULL:
+                out_of_memory = True
+                break
+            if slot[0] < 0:
+                slot[0] = edge_keys.size()
+                edge_keys.push_back(key)
+                edge_weights.push_back(w)
+            else:
+                edge_weights[slot[0]] += w
+    free(line)
+    fclose(source)
+    _table_free(&position)
+    _table_free(&edge_position)
+    if out_of_memory:
+        raise MemoryError()
+    if short_line:
+        raise ValueError(f"Line {short_line} of {path_in} has fewer than {max(u_col, v_col, w_col) + 1} columns")
+    if overflow_line:
+        raise OverflowError(f"Line {overflow_line} of {path_in} has a value that does not fit in 64 bits")
+
+    # renumber nodes 1...N in sorted order
+    cdef size_t n_nodes = node_ids.size()
+    cdef vector[pair[int64_t, int64_t]] order
+    cdef vector[int64_t] rank = vector[int64_t](n_nodes)
+    cdef size_t k
+    for k in range(n_nodes):
+        order.push_back(pair[int64_t, int64_t](node_ids[k], k))
+    sort(order.begin(), order.end())
+    for k in range(n_nodes):
+        rank[order[k].second] = k + 1
+
+    # fprintf returns a negative number if a write fails (e.g. the disk is full)
+    cdef bint failed = False
+    cdef FILE *dest = _open_for_writing(edges_out)
+    with nogil:
+        for k in range(edge_keys.size()):
+            if fprintf(dest, "%lld %lld %lld\n", <long long>rank[edge_keys[k] >> 32],
+                       <long long>rank[edge_keys[k] & low_bits], <long long>edge_weights[k]) < 0:
+                failed = True
+                break
+    _close(dest, edges_out, failed)
+    dest = _open_for_writing(key_out)
+    with nogil:
+        for k in range(n_nodes):
+            if fprintf(dest, "%lld\n", <long long>order[k].first) < 0:
+                failed = True
+                break
+    _close(dest, key_out, failed)
+    dest = _open_for_writing(info_out)
+    failed = fprintf(dest, "%zu %zu\n", n_nodes, edge_keys.size()) < 0
+    _close(dest, info_out, failed)
+    dest = _open_for_writing(degree_out)
+    with nogil:
+        for k in range(n_nodes):
+            if fprintf(dest, "%lld %lld\n", <long long>degree[order[k].second],
+                       <long long>strength[order[k].second]) < 0:
+                failed = True
+                break
+    _close(dest, degree_out, failed)
+    return n_nodes, edge_keys.size(), bad_lines
+
+
+cdef FILE *_open_for_writing(path) except NULL:
+    cdef bytes b_path = os.fsencode(path)
+    cdef FILE *dest = fopen(b_path, "w")
+    if dest == NULL:
+        raise OSError(f"Could not open {path} for writing")
+    return dest
+
+
+cdef int _close(FILE *dest, path, bint failed) except -1:
+    """Close `dest`, raising `OSError` if any write to it (including the final flush) failed"""
+    if fclose(dest) != 0 or failed:
+        raise OSError(errno.errno, os.strerror(errno.errno), path)
+    return 0
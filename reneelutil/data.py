@@ -7,37 +7,89 @@ import pandas as pd
 import numpy as np
 import re
 from re import Pattern
+from functools import lru_cache
+from importlib.util import find_spec
+
+_HAS_PYARROW = find_spec("pyarrow") is not None
+
+# partition_[name]_[seed]-[chi]-[id].[ext], as written by run_reneel
+_PARTITION_REGEX = re.compile(r"^partition_(?P<name>.+)_(?P<seed>[1-9][0-9]*)-(?P<chi>[0-9]*\.[0-9]*)-(?P<id>[^.]+)(?P<ext>\.[a-zA-Z]+)?")
 
 
 def load_matrix(matrix_file: Path):
     """Load the given connectivity matrix and return it as a dataframe.
-    Currently just a wrapper for `pandas.read_csv`"""
+    Currently just a wrapper for `pandas.read_csv`, using the multithreaded
+    pyarrow parser if pyarrow is installed"""
     logging.info(f"Reading file {matrix_file.resolve()}")
-    return pd.read_csv(matrix_file, index_col=0, header=0)
+    if not _HAS_PYARROW:
+        return pd.read_csv(matrix_file, index_col=0, header=0)
+    matrix = pd.read_csv(matrix_file, index_col=0, header=0, engine="pyarrow")
+    if matrix.index.name == "":
+        # the pyarrow engine names a blank index header "" rather than None
+        matrix.index.name = None
+    return matrix
 
 
 def matrix_to_edgelist(matrix: pd.DataFrame, pre="rows", threshold=0):
-    """Stack the matrix and drop edges less or equal to threshold"""
+    """List the entries of the matrix greater than threshold as (row, column, weight) edges"""
     logging.debug(f"Treating {pre} as presynaptic; {threshold = }")
-    edgelist = matrix.stack()
-    renamer = {0: "weight"}
+    values = matrix.to_numpy()
+    rows, cols = np.nonzero(values > threshold)
     if pre == "rows":
-        renamer["level_0"] = "bodyId_pre"
-        renamer["level_1"] = "bodyId_post"
+        row_name, col_name = "bodyId_pre", "bodyId_post"
     else:
-        renamer["level_0"] = "bodyId_post"
-        renamer["level_1"] = "bodyId_pre"
-    edf = pd.DataFrame(edgelist[edgelist > threshold]).reset_index().rename(columns=renamer)
-    edf.weight = edf.weight.astype(int)
+        row_name, col_name = "bodyId_post", "bodyId_pre"
+    edf = pd.DataFrame({row_name: matrix.index.to_numpy()[rows],
+                        col_name: matrix.columns.to_numpy()[cols],
+                        "weight": values[rows, cols].astype(int)})
     return edf
 
 
-def _get_filename_parts(path):
+@lru_cache(maxsize=4096)
+def _get_filename_parts(path: str):
     """the output files from run_reneel are named 
     [type]_[data name]_[seed]-[chi]-[tmp_id].[ext]
     This splits it at '_' at most twice and returns
-    type, data name, seed-chi-tmp_id"""
-    return Path(path).stem.split("_", maxsplit=2)
+    type, data name, seed-chi-tmp_id
+
+    Cached, since notebooks tend to load the same partitions over and over."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return tuple(stem.split("_", maxsplit=2))
+
+
+@lru_cache(maxsize=4096)
+def _parse_partition_and_key(key_file: str, partition_file: str):
+    """Check that `key_file` and `partition_file` belong to the same run and
+    return (name, seed, chi, tmp_id) parsed from the partition file name"""
+    key_type, key_name = _get_filename_parts(key_file)
+    partition_type, partition_name, info = _get_filename_parts(partition_file)
+    assert key_type == "key", f"Key file {key_file} does not appear to be a key"
+    assert partition_type == "partition", f"Partition file {partition_file} does not appear to be a partition file"
+    assert key_name == partition_name, f"Key name {key_name} does not match partition name {partition_name}"
+    seed, chi, tmp = info.split("-", maxsplit=2)
+    return partition_name, int(seed), float(chi), tmp
+
+
+def _read_int_column(file):
+    """Read a file with one integer per line (key or partition file) into an int64 array.
+    Uses pyarrow's vectorized CSV parser if available, otherwise `np.loadtxt`"""
+    if not _HAS_PYARROW:
+        return np.loadtxt(file, dtype=np.int64, ndmin=1)
+    import pyarrow as pa
+    from pyarrow import csv
+    table = csv.read_csv(file,
+                         read_options=csv.ReadOptions(autogenerate_column_names=True),
+                         convert_options=csv.ConvertOptions(column_types={"f0": pa.int64()}))
+    return table.column(0).to_numpy()
+
+
+def _load_keys(key_file, node_convert=int):
+    """Load the original node ids from a key file (one per line), converted with `node_convert`.
+    Other than integer ids, each whole line is an id (it may contain spaces or '#')"""
+    if node_convert is int:
+        return _read_int_column(key_file)
+    with open(key_file, "r") as kf:
+        return [node_convert(key.strip()) for key in kf]
 
 
 def load_partition(key_file, partition_file,
@@ -47,29 +99,22 @@ def load_partition(key_file, partition_file,
     whose index is the bodyIds and a single column giving the cluster
     id for each neuron. The column name will be either `chi` or `(chi, seed)`
     (inferred from the partition file name) depending on `include_seed`"""
-    key_file = Path(key_file).resolve()
-    partition_file = Path(partition_file).resolve()
-    key_type, key_name = _get_filename_parts(key_file)
-    partition_type, partition_name, info = _get_filename_parts(partition_file)
-    assert key_type == "key", f"Key file {key_file} does not appear to be a key"
-    assert partition_type == "partition", f"Partition file {partition_file} does not appear to be a partition file"
-    assert key_name == partition_name, f"Key name {key_name} does not match partition name {partition_name}"
-    seed, chi, tmp = info.split("-", maxsplit=2)
-    seed = int(seed)
-    chi = float(chi)
-    with open(key_file, "r") as kf, open(partition_file, "r") as pf:
-        df = pd.DataFrame([(node_convert(key.strip()), int(cluster.strip())) for key, cluster in zip(kf.readlines(), pf.readlines())])
-    df = df.set_index(0)
+    key_file = os.fspath(key_file)
+    partition_file = os.fspath(partition_file)
+    name, seed, chi, tmp = _parse_partition_and_key(key_file, partition_file)
+    keys = _load_keys(key_file, node_convert)
+    clusters = _read_int_column(partition_file)
+    assert len(keys) == len(clusters), f"Key file {key_file} has {len(keys)} nodes but partition file {partition_file} has {len(clusters)}"
+    df = pd.DataFrame({0: clusters}, index=pd.Index(keys, name=index_name))
     if include_seed:
         df.columns = pd.Index([(chi, seed)])
     else:
         df.columns = [chi]
-    df.index.name = index_name
     return df
 
 
 def get_available_clustering(clustering_dir: str | Path="../results/clustering",
-                             name_regex:str | Pattern="^partition_(?P<name>.+)_(?P<seed>[1-9][0-9]*)-(?P<chi>[0-9]*\.[0-9]*)-(?P<id>[^.]+)(?P<ext>\.[a-zA-Z]+)?"):
+                             name_regex:str | Pattern=_PARTITION_REGEX):
     """Look for files named 'partition_[name]_[seed]-[chi]-[id] in the
     specified directory and return a dataframe with info.
     
@@ -92,12 +137,12 @@ def get_available_clustering(clustering_dir: str | Path="../results/clustering",
     #         available.append((name, chi, seed, tmp, Path(clustering_dir, file)))
     #     except ValueError:
     #         continue
-    for file in [f for f in os.listdir(clustering_dir) if f.startswith("partition")]:
-        m = ex.match(file)
-        if m is not None:
-            seed = int(m["seed"])
-            chi = float(m["chi"])
-        available.append((m["name"], chi, seed, m["id"], Path(clustering_dir, file)))
+    with os.scandir(clustering_dir) as entries:
+        for entry in entries:
+            m = ex.match(entry.name)
+            if m is None:
+                continue
+            available.append((m["name"], float(m["chi"]), int(m["seed"]), m["id"], entry.path))
     all_files = pd.DataFrame(available, columns=["name", "chi", "seed", "id", "file"]).sort_values(["name","chi"])
     return all_files
 
@@ -106,10 +151,14 @@ def load_selected_runs(selected_runs: dict | str | Path,
                        preprocessed_dir="../data/preprocessed",
                        clustering_dir="../results/clustering",
                        ext="txt",
-                       **kwargs):
+                       index_name="bodyId",
+                       node_convert=int):
     """Load the partitions specified into one big dataframe.
     If `selected_runs` is a string or a path, it should point to a json file.
     Otherwise, it assumes that `selected_runs` is a `dict`.
+
+    All partitions share the same key file, so the node ids are loaded once
+    and each partition is read straight into its column of a preallocated array.
     
     The dict should have the following structure:
     {
@@ -123,18 +172,19 @@ def load_selected_runs(selected_runs: dict | str | Path,
         with open(selected_runs, "r") as jsonfile:
             selected_runs = json.load(jsonfile)
     available = get_available_clustering(clustering_dir=clustering_dir)
-    parts = []
     name = selected_runs["name"]
-    key_file = Path(preprocessed_dir, f"key_{name}.{ext}")
-    for run in selected_runs["runs"]:
-        matches = available.query(f"name == '{name}' & chi == {run['chi']} & seed.isin({run['seeds']})")
-        for partition_file in matches['file']:
-            current_partition = load_partition(key_file,
-                                            partition_file,
-                                            include_seed=(len(run['seeds']) > 1),
-                                            **kwargs)
-            parts.append(current_partition)
-    nodes = pd.concat(parts, axis=1)
+    key_file = os.path.join(preprocessed_dir, f"key_{name}.{ext}")
+    requested = pd.DataFrame([(name, float(run["chi"]), int(seed), len(run["seeds"]) > 1)
+                              for run in selected_runs["runs"] for seed in run["seeds"]],
+                             columns=["name", "chi", "seed", "include_seed"])
+    matches = requested.merge(available, on=["name", "chi", "seed"])
+    keys = _load_keys(key_file, node_convert)
+    clusters = np.empty((len(keys), len(matches)), dtype=np.int64, order="F")
+    for i, partition_file in enumerate(matches["file"]):
+        clusters[:, i] = _read_int_column(partition_file)
+    columns = pd.Index([(chi, seed) if include_seed else chi
+                        for chi, seed, include_seed in zip(matches["chi"], matches["seed"], matches["include_seed"])])
+    nodes = pd.DataFrame(clusters, index=pd.Index(keys, name=index_name), columns=columns)
     return nodes
 
 
@@ -156,8 +206,7 @@ def coclustering(name: str, chi: float=0.0,
     file_list = available_runs.query(f"(name == '{name}') & (chi == {chi})")["file"]
     coclustering = []
     for file in file_list:
-        with open(file, "r") as f:
-            clusters = np.array([int(l.strip()) for l in f])
-            coclustering.append(clusters == clusters[:, None])
+        clusters = _read_int_column(file)
+        coclustering.append(clusters == clusters[:, None])
     N = len(coclustering)
     return np.array(coclustering).mean(axis=0), N
@@ -9,14 +9,41 @@ key_[filename] has the mapping from original node index to new node index
 
 See https://github.com/prameshsingh/generalized-modularity-density"""
 import argparse
+import csv
 from pathlib import Path
 import logging
 from collections import Counter
+from itertools import islice, repeat
+from dataclasses import dataclass
+from typing import Sequence
 import shutil
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    # the Docker image ships a bare python; fall back to the pure-python reader
+    np = pd = None
+
+try:
+    from numba import njit, types
+    from numba.typed import Dict
+except ImportError:
+    njit = None
+
+try:
+    # compiled fast path for integer edgelists; see _format.pyx
+    from _format import format_edgelist as _format_compiled
+except ImportError:
+    _format_compiled = None
 
 from util import MyArgumentParser, parse_toml_args, merge_args, remap_paths_for_docker
 
+_LOG_FORMAT = "%(asctime)s %(levelname)s %(module)s\t%(message)s"
+_LOG_DATEFMT = "%m/%d/%Y %I:%M:%S %p"
+
 class AddDict(dict):
     """If `key` is missing, set the default value to `0.0`
     Useful for adding up edge weights"""
@@ -24,103 +51,357 @@ class AddDict(dict):
         return 0
 
 
+@dataclass
+class Graph:
+    """Column-oriented graph, as returned by `read_graph`.
+    `nodes` is sorted, and `strength` (total weight of incident edges) and
+    `degree` (total number of incident edges) line up with it.
+    `u`, `v` and `w` hold the endpoints and weight of each (combined) edge.
+    
+    With pandas installed these are numpy arrays, otherwise lists."""
+    nodes: Sequence
+    strength: Sequence
+    degree: Sequence
+    u: Sequence
+    v: Sequence
+    w: Sequence
+
+
 def read_graph(source: Path, sep=None, skip=0,
                directed=False,
                convert=int, weight_convert=int,
-               u_col=0, v_col=1, w_col=2):
+               u_col=0, v_col=1, w_col=2,
+               chunksize=5_000_000):
     """Read a graph from an edgelist file. Combine parallel edges by summing their weights;
     if `directed=False` also combine antiparallel edges.
+
+    Uses pandas to parse and aggregate the edgelist when it is installed,
+    otherwise falls back to reading the file line by line.
+    The file is read `chunksize` rows at a time, so memory use is bounded by the
+    size of a chunk plus the size of the combined graph, not the size of the file.
     
-    Returns:
-    nodes : a dict of node:weight pairs (total weight of incident edges)
-    degrees : a dict of a node:degree pairs (total number of incident edges)
-    edges: a dict of (v1,v2):weight pairs"""
+    Returns a `Graph`"""
     logging.info(f"Reading file {source.expanduser()}, skipping {skip} line(s), splitting at {sep=}")
+    if pd is None:
+        return _read_graph_python(source, sep=sep, skip=skip, directed=directed,
+                                  convert=convert, weight_convert=weight_convert,
+                                  u_col=u_col, v_col=v_col, w_col=w_col)
+    read_kwargs = dict(sep=sep, skip=skip, convert=convert, weight_convert=weight_convert,
+                       u_col=u_col, v_col=v_col, w_col=w_col, chunksize=chunksize)
+    try:
+        combined = _combine_chunks(_read_edge_chunks(source, **read_kwargs), directed=directed)
+    except pd.errors.EmptyDataError:
+        logging.warning(f"No edges found in {source}")
+        return Graph([], [], [], [], [], [])
+    except pd.errors.ParserError as pe:
+        logging.critical(f"Failed to split {source} using separator {sep=}\nError: {pe}")
+        exit(1)
+    except (ValueError, OverflowError) as ve:
+        logging.warning(f"Parsing issue, converting values one at a time\n{ve}")
+        try:
+            combined = _combine_chunks(_read_edge_chunks(source, strict=False, **read_kwargs),
+                                       directed=directed)
+        except OverflowError as oe:
+            # python ints have no size limit, so the line by line reader can still handle it
+            logging.warning(f"Values in {source} don't fit in 64 bits, reading it line by line\n{oe}")
+            return _read_graph_python(source, sep=sep, skip=skip, directed=directed,
+                                      convert=convert, weight_convert=weight_convert,
+                                      u_col=u_col, v_col=v_col, w_col=w_col)
+        except ValueError as ex:
+            logging.critical(f"Failed to split {source} using separator {sep=}\nError: {ex}")
+            exit(1)
+
+    u, v, w, n = combined
+    endpoints = np.concatenate([u, v])
+    order = np.argsort(endpoints, kind="stable")
+    endpoints = endpoints[order]
+    start = _run_starts(endpoints)
+    nodes = endpoints[start]
+    strength = np.add.reduceat(np.tile(w, 2)[order], start)
+    degree = np.add.reduceat(np.tile(n, 2)[order], start)
+    return Graph(nodes, strength, degree, u, v, w)
+
+
+def _read_edge_chunks(source: Path, sep=None, skip=0,
+                      convert=int, weight_convert=int,
+                      u_col=0, v_col=1, w_col=2,
+                      chunksize=5_000_000, strict=True):
+    """Parse the u, v, w columns of an edgelist, yielding dataframes of at most
+    `chunksize` rows with columns `u`, `v` and `w`.
+
+    If `strict`, the columns are parsed directly into typed arrays and a `ValueError`
+    is raised if that fails (e.g. a header row that wasn't skipped). Otherwise they are
+    read as strings and each value is converted with `convert`/`weight_convert`,
+    skipping rows that can't be parsed.
+
+    Values are taken literally (no quoting or NA detection), and string values are stripped,
+    as `str.split` would leave them. Raises `pandas.errors.ParserError` if a row has
+    too few columns."""
+    dtypes = {int: "int64", float: "float64", str: str}
+    columns = {u_col: "u", v_col: "v", w_col: "w"}
+    if strict:
+        dtype = {u_col: dtypes[convert], v_col: dtypes[convert], w_col: dtypes[weight_convert]}
+    else:
+        dtype = str
+    checked = False
+    with pd.read_csv(source, sep=r"\s+" if sep is None else sep, header=None, skiprows=skip,
+                     usecols=list(columns), skipinitialspace=True, dtype=dtype,
+                     keep_default_na=False, na_filter=False, quoting=csv.QUOTE_NONE,
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            strings = chunk.columns[chunk.dtypes == object]
+            for col in strings:
+                chunk[col] = chunk[col].str.strip()
+            # pandas pads short rows with empty values, which look just like empty fields
+            if not checked and (chunk[strings] == "").to_numpy().any():
+                _check_columns(source, sep, skip, max(columns) + 1)
+                checked = True
+            if not strict:
+                chunk = _convert_rows(chunk, {u_col: convert, v_col: convert, w_col: weight_convert}, skip)
+            yield chunk.rename(columns=columns)[["u", "v", "w"]]
+
+
+def _check_columns(source: Path, sep, skip, n_cols):
+    """Raise `pandas.errors.ParserError` for the first non-blank line of `source`
+    with fewer than `n_cols` columns when split at `sep`"""
+    strip = sep is not None
+    with open(source, "r") as f:
+        for lineno, line in enumerate(islice(f, skip, None), start=skip + 1):
+            ls = line.split(sep)
+            if (line.strip() if strip else ls) and len(ls) < n_cols:
+                raise pd.errors.ParserError(f"Line {lineno} of {source} has fewer than {n_cols} columns")
+
+
+def _combine_chunks(chunks, directed=False):
+    """Fold edgelist chunks into arrays `u, v, w, n` with one entry per distinct (u, v),
+    holding the total weight `w` and the number `n` of parallel edges combined into each edge.
+    Self-loops are dropped; if not `directed`, edges are stored as (max(u,v), min(u,v))."""
+    combined = None
+    for chunk in chunks:
+        u, v = chunk.u.to_numpy(), chunk.v.to_numpy()
+        keep = u != v
+        if not keep.all():
+            logging.debug(f"Ignoring {(~keep).sum()} self-loop(s)")
+        u, v, w = u[keep], v[keep], chunk.w.to_numpy()[keep]
+        n = np.ones(len(u), dtype=np.int64)
+        if not directed:
+            if u.dtype == object:
+                swap = u < v
+                u, v = np.where(swap, v, u), np.where(swap, u, v)
+            else:
+                u, v = np.maximum(u, v), np.minimum(u, v)
+        if combined is not None:
+            u, v, w, n = (np.concatenate([old, new]) for old, new in zip(combined, (u, v, w, n)))
+        combined = _sum_parallel_edges(u, v, w, n)
+    if combined is None:
+        raise pd.errors.EmptyDataError("No rows left after skipping")
+    return combined
+
+
+def _sum_parallel_edges(u, v, w, n):
+    """Combine repeated (u, v) pairs, summing their `w` and `n`.
+    For integer node ids this uses the numba-compiled `_sum_parallel_edges_jit` if numba
+    is installed. Otherwise the edges are sorted so repeats are adjacent and each run is
+    summed with `np.add.reduceat`. Numeric ids are sorted by a single uint64 key, (i << 32) | j,
+    where i and j are the positions of u and v in the sorted node ids (up to 2**32 distinct
+    nodes per chunk); object ids (e.g. strings) are lexsorted on (u, v) directly, which saves
+    a round of slow python comparisons."""
+    if (njit is not None and u.dtype == np.int64 and v.dtype == np.int64
+            and w.dtype in (np.int64, np.float64)):
+        return _sum_parallel_edges_jit(u, v, w, n)
+    if u.dtype == object:
+        order = np.lexsort((v, u))
+        u, v = u[order], v[order]
+        start = _run_starts(u, v)
+        return u[start], v[start], np.add.reduceat(w[order], start), np.add.reduceat(n[order], start)
+    ids, inverse = np.unique(np.concatenate([u, v]), return_inverse=True)
+    inverse = inverse.astype(np.uint64)
+    key = (inverse[:len(u)] << np.uint64(32)) | inverse[len(u):]
+    order = np.argsort(key)
+    key = key[order]
+    start = _run_starts(key)
+    key = key[start]
+    return (ids[key >> np.uint64(32)], ids[key & np.uint64(0xFFFFFFFF)],
+            np.add.reduceat(w[order], start), np.add.reduceat(n[order], start))
+
+
+def _run_starts(*columns):
+    """Indices where a run of equal rows starts in the sorted, aligned `columns`"""
+    if len(columns[0]) == 0:
+        return np.zeros(0, dtype=np.intp)
+    change = np.zeros(len(columns[0]) - 1, dtype=bool)
+    for col in columns:
+        change |= col[1:] != col[:-1]
+    return np.flatnonzero(np.concatenate([[True], change]))
+
+
+if njit is not None:
+    _EDGE_KEY = types.UniTuple(types.int64, 2)
+
+    @njit(["Tuple((int64[:], int64[:], int64[:], int64[:]))(int64[:], int64[:], int64[:], int64[:])",
+           "Tuple((int64[:], int64[:], float64[:], int64[:]))(int64[:], int64[:], float64[:], int64[:])"],
+          cache=True)
+    def _sum_parallel_edges_jit(u, v, w, n):
+        """Single pass version of `_sum_parallel_edges` using a typed dict from (u, v) to
+        the position of the edge in the output. Edges keep the order they were first seen in."""
+        position = Dict.empty(key_type=_EDGE_KEY, value_type=types.int64)
+        u_out, v_out, w_out, n_out = np.empty_like(u), np.empty_like(v), np.empty_like(w), np.empty_like(n)
+        k = 0
+        for i in range(len(u)):
+            key = (u[i], v[i])
+            if key in position:
+                j = position[key]
+                w_out[j] += w[i]
+                n_out[j] += n[i]
+            else:
+                position[key] = k
+                u_out[k], v_out[k], w_out[k], n_out[k] = u[i], v[i], w[i], n[i]
+                k += 1
+        return u_out[:k], v_out[:k], w_out[:k], n_out[:k]
+
+
+def _convert_rows(df, converters: dict, skip=0):
+    """Apply `converters` (column:callable) to `df`, dropping rows where any conversion fails"""
+    def safe(cvt):
+        def _safe(value):
+            try:
+                return cvt(value.strip())
+            except (ValueError, AttributeError):
+                return None
+        return _safe
+
+    converted = pd.DataFrame({col: df[col].map(safe(cvt)) for col, cvt in converters.items()})
+    bad = converted.isna().any(axis=1)
+    for row in df.index[bad]:
+        logging.warning(f"Parsing issue, skipping line {row + skip + 1}\n"
+                        f"{row + skip + 1}: {' '.join(df.loc[row].astype(str))}")
+    converted = converted[~bad]
+    return converted.astype({col: cvt for col, cvt in converters.items() if cvt is not str})
+
+
+def _read_graph_python(source: Path, sep=None, skip=0,
+                       directed=False,
+                       convert=int, weight_convert=int,
+                       u_col=0, v_col=1, w_col=2):
+    """Pure-python version of `read_graph`, used when pandas is not available"""
     # nodes = set()
     nodes = AddDict()
     degrees = Counter()
     edges = AddDict()
+    # local names for everything the loop touches
+    _cvt, _wcvt = convert, weight_convert
+    _nodes, _degrees, _edges = nodes, degrees, edges
+    # str.split(None) already drops surrounding whitespace; other separators don't
+    strip = sep is not None
     with open(source, "r") as f:
-        for lineno, line in enumerate(f.readlines()[skip:], start=1):
-            if line.strip():
-                try:
-                    # u, v, w = line.split(sep=sep)
-                    ls = line.split(sep=sep)
-                    u, v, w = ls[u_col], ls[v_col], ls[w_col]
-                except Exception as ex:
-                    logging.critical(f"Failed to split line {lineno + skip} using separator {sep=}\nOffending line: {line}\nError: {ex}")
-                    exit(1)
-                try:
-                    u, v, w = convert(u.strip()), convert(v.strip()), weight_convert(w.strip())
-                except ValueError as ve:
-                    logging.warning(f"Parsing issue, skipping line {lineno}\n"
-                                    f"{lineno}: {line}\n"
-                                    f"{ve}")
-                    continue
-                if not directed:
-                    u, v = max(u,v), min(u,v)
-                if u != v:
-                    nodes[u] += w
-                    nodes[v] += w
-                    degrees[u] += 1
-                    degrees[v] += 1
-                    edges[(u,v)] += w
-                else:
-                    logging.debug(f"Ignoring self-loop {u} - {v} on line {lineno + skip}")
-
-    return nodes, degrees, edges
-
-
-def write_edges(output_file: Path, edges: dict, mapper: dict):
-    """Write the formatted edgelist file"""
+        for lineno, line in enumerate(islice(f, skip, None), start=1):
+            ls = line.split(sep)
+            if not (line.strip() if strip else ls):
+                continue
+            try:
+                # u, v, w = line.split(sep=sep)
+                u, v, w = ls[u_col], ls[v_col], ls[w_col]
+            except Exception as ex:
+                logging.critical(f"Failed to split line {lineno + skip} using separator {sep=}\nOffending line: {line}\nError: {ex}")
+                exit(1)
+            if strip:
+                u, v, w = u.strip(), v.strip(), w.strip()
+            try:
+                u, v, w = _cvt(u), _cvt(v), _wcvt(w)
+            except ValueError as ve:
+                logging.warning(f"Parsing issue, skipping line {lineno}\n"
+                                f"{lineno}: {line}\n"
+                                f"{ve}")
+                continue
+            if u == v:
+                logging.debug(f"Ignoring self-loop {u} - {v} on line {lineno + skip}")
+                continue
+            if not directed and u < v:
+                u, v = v, u
+            _nodes[u] = _nodes[u] + w
+            _nodes[v] = _nodes[v] + w
+            _degrees[u] = _degrees[u] + 1
+            _degrees[v] = _degrees[v] + 1
+            _edges[u, v] = _edges[u, v] + w
+
+    node_list = sorted(nodes)
+    return Graph(node_list, [nodes[k] for k in node_list], [degrees[k] for k in node_list],
+                 [e[0] for e in edges], [e[1] for e in edges], list(edges.values()))
+
+
+def _write_columns(dest, *columns):
+    """Write the given columns to the open file `dest`, space separated, one row per line.
+    Numeric columns are written with `pandas.DataFrame.to_csv` if available, so rows are
+    formatted in C rather than with one `print` per line. Strings (e.g. node ids) are written
+    as they are, since `to_csv` would quote or escape some of them."""
+    if pd is not None and all(np.asarray(col).dtype != object for col in columns):
+        pd.DataFrame(dict(enumerate(columns))).to_csv(dest, sep=" ", header=False, index=False,
+                                                      lineterminator="\n")
+    else:
+        dest.write("".join(" ".join(map(str, row)) + "\n" for row in zip(*columns)))
+
+
+def renumber(nodes, ids):
+    """Map each of `ids` to its 1-based position in the sorted sequence `nodes`.
+    Uses a binary search (`np.searchsorted`) when numpy is available."""
+    if np is not None:
+        return np.searchsorted(nodes, ids) + 1
+    mapper = {v: i for i, v in enumerate(nodes, start=1)}
+    return [mapper[i] for i in ids]
+
+
+def write_edges(output_file: Path, graph: Graph):
+    """Write the formatted edgelist file, with nodes renumbered 1...N"""
     # output_file = output_file.with_stem(output_file.stem + suffix)
     with open(output_file, "w") as dest:
-        logging.info(f"Writing formatted, renumbered edgelist to {output_file.expanduser()}")
-        for e, w in edges.items():
-            print(f"{mapper[e[0]]} {mapper[e[1]]} {w}", file=dest)
+        logging.info(f"Writing formatted, renumbered edgelist to {output_file}")
+        _write_columns(dest, renumber(graph.nodes, graph.u), renumber(graph.nodes, graph.v), graph.w)
 
 
 def write_key(key_file: Path, mapper: dict):
     """Write the format key. Each line is `original_id formatted_id`"""
     # key_file = key_file.with_stem(key_file.stem + "_key")
     with open(key_file, "w") as dest:
-        logging.info(f"Writing mapping to {key_file.expanduser()}")
-        for k, v in mapper.items():
-            print(f"{k} {v}", file=dest)
+        logging.info(f"Writing mapping to {key_file}")
+        dest.write("".join(f"{k} {v}\n" for k, v in mapper.items()))
 
 
 def write_simple_key(key_file: Path, nodes):
-    """Write the nodes in sorted order"""
+    """Write the nodes (already in sorted order)"""
     with open(key_file, "w") as dest:
-        logging.info(f"Writing node list to {key_file.expanduser()}")
-        for k in sorted(nodes):
-            print(k, file=dest)
+        logging.info(f"Writing node list to {key_file}")
+        _write_columns(dest, nodes)
 
 
 def read_key(key_file:Path, cvt=int):
     """Read the format key from a file and store it as a dict
     Assumes each line is `original_id formatted_id`
     `formatted_id` is always an int, but `cvt` will be used to convert `original_id` to the specified type."""
+    if pd is not None and cvt in (int, float, str):
+        # ids are taken literally, as str.split would (no NA detection or quoting)
+        key = pd.read_csv(key_file, sep=r"\s+", header=None, usecols=[0, 1],
+                          dtype={0: {int: "int64", float: "float64", str: str}[cvt], 1: "int64"},
+                          keep_default_na=False, na_filter=False, quoting=csv.QUOTE_NONE)
+        return dict(zip(key[1].tolist(), key[0].tolist()))
     with open(key_file, "r") as source:
         unmapper = {int(l.split()[1].strip()): cvt(l.split()[0].strip()) for l in source.readlines() if l.strip()}
     return unmapper
 
 
-def write_info(info_file: Path, nodes, edges):
+def write_info(info_file: Path, graph: Graph):
     """Write the info file, which simply has the number of nodes and number of edges in the network
     (Note, this is number of edges, ignoring weight)"""
     with open(info_file, "w") as dest:
-        logging.info(f"Writing info file to {info_file.expanduser()}")
-        print(f"{len(nodes)} {len(edges)}", file=dest)
+        logging.info(f"Writing info file to {info_file}")
+        print(f"{len(graph.nodes)} {len(graph.u)}", file=dest)
 
 
-def write_degree(degree_file: Path, nodes: dict, degrees: dict):
+def write_degree(degree_file: Path, graph: Graph):
     """Write the degree file.
     Each line has the unweighted and weighted degree of a node, in sorted order."""
     with open(degree_file, "w") as dest:
-        logging.info(f"Writing degree file to {degree_file.expanduser()}")
-        for v in sorted(nodes):
-            print(f"{degrees[v]} {nodes[v]}", file=dest)
+        logging.info(f"Writing degree file to {degree_file}")
+        _write_columns(dest, graph.degree, graph.strength)
 
 
 def load_partition(file_stem, chi, seed=17289,
@@ -136,6 +417,7 @@ def load_partition(file_stem, chi, seed=17289,
     It looks for the former if `old_format=False` (the default) and the latter if True.
     
     If an existing dataframe is passed, merge information into it."""
+    import numpy as np
     import pandas as pd
     # try to find partition_file_stem and key_file_stem
     if dir is None:
@@ -169,10 +451,9 @@ def load_partition(file_stem, chi, seed=17289,
     
     unmapper = read_key(key_file)
     df = pd.DataFrame.from_dict(unmapper, orient="index", columns=[index_name])
-    df[chi] = 0
-    with open(partition_file, "r") as part:
-        for i, l in enumerate(part.readlines(), start=1):
-            df.loc[i][chi] = int(l.strip())
+    # line i of the partition file is the cluster of formatted node i
+    clusters = np.loadtxt(partition_file, dtype=np.int64, ndmin=1)
+    df[chi] = pd.Series(clusters, index=range(1, len(clusters) + 1))
     df = df.set_index(index_name)
     if existing_df is not None:
         merged = existing_df.merge(df, left_index=True, right_index=True, how="outer", suffixes=["", f"_{file_stem}"])
@@ -223,52 +504,99 @@ def format_for_reneel(**args):
     wcvt = {"int": int,
             "float": float}.get(args["wtype"], int)
 
-    for file in args["input"]:
-        source_path = Path(file).expanduser()
-        origin_name = source_path.stem.replace(original_prefix, "").replace(original_suffix, "")
-        # copy_file = source_path.with_stem(f"original_{source_path.stem}{suffix}")
-        # copy_file = source_path.with_stem(f"original_{origin_name}{suffix}")
-        # if args["copy"] or len(prefix) == 0:
-        #     logging.debug(f"Creating a copy ({copy_file}) of the input file ({source_path})")
-        #     shutil.copyfile(source_path, copy_file)
-        
-        if args["output"] is None:
-            outputdir = Path(source_path.parent)
-            logging.debug(f"Inferred output directory {outputdir.expanduser()}")
+    # everything _process_one_file needs, already parsed, so it can be sent to worker processes
+    opts = dict(sep=sep, convert=cvt, weight_convert=wcvt,
+                original_prefix=original_prefix, original_suffix=original_suffix, suffix=suffix,
+                output=args["output"], skip=args["skip"], directed=args["directed"],
+                u_col=args["u_col"], v_col=args["v_col"], w_col=args["w_col"],
+                chunksize=args.get("chunksize", _DEFAULTS["chunksize"]))
+    files = args["input"]
+    # callers that predate --nparallel get the old one-file-at-a-time behaviour
+    nparallel = min(len(files), args.get("nparallel", 1) or os.cpu_count() or 1)
+    if nparallel <= 1:
+        for file in files:
+            _process_one_file(file, opts)
+        return
+    # each file is independent, so format them in parallel
+    logging.info(f"Formatting {len(files)} files using {nparallel} processes")
+    with ProcessPoolExecutor(max_workers=nparallel, initializer=_init_worker,
+                             initargs=(logging.getLogger().level,)) as ex:
+        list(ex.map(_process_one_file, files, repeat(opts)))
+
+
+def _init_worker(level):
+    """Set up logging in a worker process the same way as the main script"""
+    logging.basicConfig(format=_LOG_FORMAT, datefmt=_LOG_DATEFMT, level=level)
+
+
+def _process_one_file(file, opts):
+    """Format a single edgelist `file`. `opts` holds the parsed options from `format_for_reneel`"""
+    sep, suffix = opts["sep"], opts["suffix"]
+    # plain strings and os.path throughout; only read_graph gets a Path
+    source_path = os.path.expanduser(file)
+    source_name = os.path.basename(source_path)
+    source_stem, ext = os.path.splitext(source_name)
+    origin_name = source_stem.replace(opts["original_prefix"], "").replace(opts["original_suffix"], "")
+    # copy_file = source_path.with_stem(f"original_{source_path.stem}{suffix}")
+    # copy_file = source_path.with_stem(f"original_{origin_name}{suffix}")
+    # if args["copy"] or len(prefix) == 0:
+    #     logging.debug(f"Creating a copy ({copy_file}) of the input file ({source_path})")
+    #     shutil.copyfile(source_path, copy_file)
+    
+    if opts["output"] is None:
+        outputdir = os.path.dirname(source_path) or "."
+        logging.debug(f"Inferred output directory {outputdir}")
+    else:
+        outputdir = os.fspath(opts["output"])
+    if not os.path.isdir(outputdir):
+        logging.debug(f"Attempting to create directory {outputdir}")
+        os.makedirs(outputdir)
+    # output_file = source_path.with_stem(prefix + source_path.stem + suffix)
+    # clean_file = source_path.with_stem("clean_" + source_path.stem + suffix)
+    # key_file = source_path.with_stem("key_" + source_path.stem + suffix)
+    # info_file = source_path.with_stem("info_" + source_path.stem + suffix)
+    # degree_file = source_path.with_stem("degree_" + source_path.stem + suffix)
+    output_file = os.path.join(outputdir, f"clean_{origin_name}{suffix}{ext}")
+    # clean_file = Path(outputdir, source_path.name).with_stem(f"clean_{origin_name}{suffix}")
+    key_file = os.path.join(outputdir, f"key_{origin_name}{suffix}{ext}")
+    info_file = os.path.join(outputdir, f"info_{origin_name}{suffix}{ext}")
+    degree_file = os.path.join(outputdir, f"degree_{origin_name}{suffix}{ext}")
+
+    # output_file = Path(outputdir, source_path.name).with_stem(f"{prefix}{origin_name}{suffix}")
+
+
+    if _format_compiled is not None and opts["convert"] is int and opts["weight_convert"] is int:
+        logging.info(f"Formatting {source_path} with the compiled formatter")
+        try:
+            n_nodes, n_edges, n_bad = _format_compiled(source_path, output_file, key_file, info_file, degree_file,
+                                                       sep=sep, skip=opts["skip"], directed=opts["directed"],
+                                                       u_col=opts["u_col"], v_col=opts["v_col"], w_col=opts["w_col"])
+        except OverflowError as oe:
+            logging.info(f"{oe}; formatting {source_path} in python instead")
+        except ValueError as ve:
+            logging.critical(f"Failed to split {source_path} using separator {sep=}\nError: {ve}")
+            exit(1)
         else:
-            outputdir = Path(args["output"])
-        if not outputdir.is_dir():
-            logging.debug(f"Attempting to create directory {outputdir.expanduser()}")
-            os.makedirs(outputdir)
-        # output_file = source_path.with_stem(prefix + source_path.stem + suffix)
-        # clean_file = source_path.with_stem("clean_" + source_path.stem + suffix)
-        # key_file = source_path.with_stem("key_" + source_path.stem + suffix)
-        # info_file = source_path.with_stem("info_" + source_path.stem + suffix)
-        # degree_file = source_path.with_stem("degree_" + source_path.stem + suffix)
-        output_file = Path(outputdir, source_path.name).with_stem(f"clean_{origin_name}{suffix}")
-        # clean_file = Path(outputdir, source_path.name).with_stem(f"clean_{origin_name}{suffix}")
-        key_file = Path(outputdir, source_path.name).with_stem(f"key_{origin_name}{suffix}")
-        info_file = Path(outputdir, source_path.name).with_stem(f"info_{origin_name}{suffix}")
-        degree_file = Path(outputdir, source_path.name).with_stem(f"degree_{origin_name}{suffix}")
-
-        # output_file = Path(outputdir, source_path.name).with_stem(f"{prefix}{origin_name}{suffix}")
-
-
-        # load the graph into memory
-        nodes, degrees, edges = read_graph(source_path, sep=sep, skip=args["skip"],
-                                        directed=args["directed"], convert=cvt, weight_convert=wcvt,
-                                        u_col=args["u_col"], v_col=args["v_col"], w_col=args["w_col"])
-        logging.info(f"Read in {len(nodes)} nodes and {len(edges)} edges")
-        # mapper = dict(zip(sorted(nodes.keys()), range(1, len(nodes) + 1)))
-        mapper = {v: i for i, v in enumerate(sorted(nodes), start=1)}
-
-        write_edges(output_file, edges, mapper)
-        # logging.debug(f"Creating 'clean_' copy ({clean_file}) for reneel executable")
-        # shutil.copyfile(output_file, clean_file)
-        # write_key(key_file, mapper)
-        write_simple_key(key_file, nodes)
-        write_info(info_file, nodes, edges)
-        write_degree(degree_file, nodes, degrees)
+            if n_bad:
+                logging.warning(f"Parsing issue, skipped {n_bad} line(s) that could not be read as integers")
+            logging.info(f"Read in {n_nodes} nodes and {n_edges} edges")
+            return
+
+    # load the graph into memory
+    graph = read_graph(Path(source_path), sep=sep, skip=opts["skip"],
+                                    directed=opts["directed"], convert=opts["convert"], weight_convert=opts["weight_convert"],
+                                    u_col=opts["u_col"], v_col=opts["v_col"], w_col=opts["w_col"],
+                                    chunksize=opts["chunksize"])
+    logging.info(f"Read in {len(graph.nodes)} nodes and {len(graph.u)} edges")
+    # mapper = dict(zip(sorted(nodes.keys()), range(1, len(nodes) + 1)))
+
+    write_edges(output_file, graph)
+    # logging.debug(f"Creating 'clean_' copy ({clean_file}) for reneel executable")
+    # shutil.copyfile(output_file, clean_file)
+    # write_key(key_file, mapper)
+    write_simple_key(key_file, graph.nodes)
+    write_info(info_file, graph)
+    write_degree(degree_file, graph)
 
 
 
@@ -282,6 +610,8 @@ _DEFAULTS = {
     "u_col":    0,
     "v_col":    1,
     "w_col":    2,
+    "chunksize": 5_000_000,
+    "nparallel": None,
     "docker":   False,
     "inprefix": "",
     "insuffix": "",
@@ -329,6 +659,8 @@ This python script is an attempt to reverse-engineer the `work.sh` file.""",
                     help="Output directory (will be created if needed)")
     io_group.add_argument("--outputdir", dest="output", default=None,
                     help="Deprecated alias for --output")
+    io_group.add_argument("--nparallel", type=int, default=None,
+                    help="Number of input files to format in parallel. Default is one per file, up to the number of CPUs")
     io_group.add_argument("--inprefix", default=None, 
                     help="Assumes input filename is of the form [inprefix]_[file]_[insuffix].[ext]. For purposes of naming outputs, will ignore [inprefix]")
     io_group.add_argument("--insuffix", default=None, 
@@ -358,6 +690,8 @@ This python script is an attempt to reverse-engineer the `work.sh` file.""",
                     help="Which column contains the target node of each edge. Default 1 for second column")
     structure_group.add_argument('-w', '--w_col', type=int, default=None,
                     help="Which column contains the edge weight. Default 2 for third column")
+    structure_group.add_argument("--chunksize", type=int, default=None,
+                    help="Number of rows of the edgelist to parse at a time. Lower this if you run out of memory on very large files. Default 5000000")
     cli_args = ap.parse_args()
 
     cfg = parse_toml_args(cli_args.config, Path(__file__).stem)
@@ -375,8 +709,7 @@ This python script is an attempt to reverse-engineer the `work.sh` file.""",
     args = merge_args(cli_args, cfg, _DEFAULTS)
 
     loglevel = args["verbose"].upper()
-    logging.basicConfig(format="%(asctime)s %(levelname)s %(module)s\t%(message)s",
-                        datefmt='%m/%d/%Y %I:%M:%S %p',
+    logging.basicConfig(format=_LOG_FORMAT, datefmt=_LOG_DATEFMT,
                         level=getattr(logging, loglevel))
     logging.debug(f"Commandline arguments:   {cli_args}")
     logging.debug(f"Final configuration:     {args}")
@@ -7,21 +7,33 @@ $ python run_reneel data/edgelist_file --chi 0.0 --nruns 10
 result would be that reneel is run 10 times, each time with a different
 random seeds.
 """
-import argparse, logging
+import argparse, logging, json
+import asyncio
 import os, shutil
 import tomllib
-from pathlib import Path
+from pathlib import Path, PurePath
 import subprocess
 import time
-from itertools import cycle, product
+from itertools import cycle, islice, product
+from functools import lru_cache
 from secrets import randbits, token_hex
 from tempfile import TemporaryDirectory
-from dataclasses import dataclass, field, asdict
+from contextlib import nullcontext
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 
 from util import MyArgumentParser, parse_toml_args, merge_args, remap_paths_for_docker
 
 
+def _ncpu():
+    """Number of CPUs this process may run on. Unlike `os.cpu_count()`, this respects
+    taskset/cgroup restrictions (e.g. a Slurm allocation); falls back to `os.cpu_count()`
+    where `os.sched_getaffinity` isn't available (macOS, Windows)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count()
+
+
 @dataclass
 class ReneelRun:
     """Class tracking input and output files to a run of reneel"""
@@ -42,20 +54,45 @@ class ReneelRun:
 
     def __post_init__(self):
         self.edgelist_file = Path(self.edgelist_file)
-        if not self.edgelist_file.exists():
-            raise FileNotFoundError(f"Missing edgelist file {self.edgelist_file}")
-        for prefix in ["clean_", "degree_", "info_"]:
-            file = self.edgelist_file.with_stem(f"{prefix}{self.edgelist_file.stem}")
-            if not file.exists():
-                raise FileNotFoundError(f"Can't find associated file {file}")
-            self.associated_files.append(file)
+        self.associated_files.extend(_find_associated_files(self.edgelist_file))
         # self.clean_file = self.edgelist_file.with_stem(f"clean_{self.edgelist_file.stem}")
         # self.degree_file = self.edgelist_file.with_stem(f"degree_{self.edgelist_file.stem}")
         # self.info_file = self.edgelist_file.with_stem(f"info_{self.edgelist_file.stem}")
     
 
     def __str__(self):
-        return "\n".join(f"{k}: {v}" for k,v in asdict(self).items())
+        # fields() rather than asdict(), which would deep-copy every value just to print it
+        return "\n".join(f"{f.name}: {getattr(self, f.name)}" for f in fields(self))
+
+
+@lru_cache(maxsize=None)
+def _find_associated_files(edgelist_file: Path):
+    """Check that `edgelist_file` and its clean_, degree_ and info_ files exist, and return
+    the latter. The directory is listed once rather than checking each file, and the result
+    is cached since a sweep creates many runs for the same edgelist."""
+    try:
+        with os.scandir(edgelist_file.parent) as entries:
+            present = {entry.name for entry in entries}
+    except FileNotFoundError:
+        present = set()
+    if edgelist_file.name not in present:
+        raise FileNotFoundError(f"Missing edgelist file {edgelist_file}")
+    associated = []
+    for prefix in ["clean_", "degree_", "info_"]:
+        file = edgelist_file.with_stem(f"{prefix}{edgelist_file.stem}")
+        if file.name not in present:
+            raise FileNotFoundError(f"Can't find associated file {file}")
+        associated.append(file)
+    return tuple(associated)
+
+
+def _json_default(obj):
+    """Convert the non-JSON fields of a `ReneelRun` for the log file"""
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, subprocess.CompletedProcess):
+        return {"args": obj.args, "returncode": obj.returncode, "stderr": obj.stderr}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def seed_generator(seeds=None):
@@ -70,23 +107,67 @@ def seed_generator(seeds=None):
 
 
 def ensure_dir_exists(path):
-    """Checks if the given directory exists. If not, creates it."""
-    _path = Path(path).resolve()
-    if not _path.is_dir():
-        os.makedirs(_path)
+    """Creates the given directory if it doesn't exist yet."""
+    # exist_ok rather than checking first: one syscall, and no race with other runs creating it
+    os.makedirs(path, exist_ok=True)
     return None
 
 
+@lru_cache(maxsize=None)
+def _resolve_output_dir(output_dir):
+    """Create `output_dir` if needed and return its absolute path.
+    Cached, since every run in a sweep writes to the same directory."""
+    ensure_dir_exists(output_dir)
+    return Path(output_dir).resolve()
+
+
+@lru_cache(maxsize=None)
+def _command_prefix(path_to_executable, rg_parameter, test_mode=False):
+    """The start of the reneel command line (resolved executable and rg parameter, as strings),
+    which is the same for every run in a sweep"""
+    prefix = ("echo",) if test_mode else ()
+    return prefix + (str(Path(path_to_executable).resolve()), str(rg_parameter))
+
+
 def run_reneel_and_collect_output(path_to_executable,
                                   output_dir,
                                   reneel_run: ReneelRun,
                                   keep_results=False, test_mode=False,
-                                  n_cpu=os.cpu_count()):
+                                  n_cpu=_ncpu()):
     """Run reneel in the input file's directory without copying input files.
 
     Uses a random hex ID to uniquely name output files, replacing the old
     temp-directory name that served the same purpose.
+
+    Blocks until reneel finishes; see `run_reneel_and_collect_output_async`
+    to supervise several runs at once.
+
+    Returns `reneel_run`, updated with the output files and timing.
     """
+    return _run_steps(_reneel_steps(path_to_executable, output_dir, reneel_run,
+                                    keep_results=keep_results, test_mode=test_mode, n_cpu=n_cpu))
+
+
+async def run_reneel_and_collect_output_async(path_to_executable,
+                                              output_dir,
+                                              reneel_run: ReneelRun,
+                                              keep_results=False, test_mode=False,
+                                              n_cpu=_ncpu()):
+    """Coroutine version of `run_reneel_and_collect_output`: reneel is started with
+    `asyncio.create_subprocess_exec`, so one python process can supervise several
+    runs at once (see `_gate`).
+
+    Returns `reneel_run`, updated with the output files and timing.
+    """
+    return await _run_steps_async(_reneel_steps(path_to_executable, output_dir, reneel_run,
+                                                keep_results=keep_results, test_mode=test_mode, n_cpu=n_cpu))
+
+
+def _reneel_steps(path_to_executable, output_dir, reneel_run: ReneelRun,
+                  keep_results=False, test_mode=False, n_cpu=_ncpu()):
+    """The body of `run_reneel_and_collect_output` and its coroutine version, as a generator
+    (see `_run_steps`): it yields the reneel command, working directory and environment, is sent the
+    resulting `CompletedProcess`, and returns the updated `reneel_run`."""
     rg_ensemble_per_cpu = max(reneel_run.rg_ensemble_size // n_cpu, 1)
     if rg_ensemble_per_cpu * n_cpu != reneel_run.rg_ensemble_size:
         logging.warning(f"Using rg ensemble size {rg_ensemble_per_cpu * n_cpu}; expected {reneel_run.rg_ensemble_size} but {n_cpu = }")
@@ -94,11 +175,7 @@ def run_reneel_and_collect_output(path_to_executable,
     if reneel_ensemble_per_cpu * n_cpu != reneel_run.reneel_ensemble_size:
         logging.warning(f"Using reneel iteration size {reneel_ensemble_per_cpu * n_cpu}; expected {reneel_run.reneel_ensemble_size} but {n_cpu = }")
 
-    current_dir = os.getcwd()
-    _output_dir = Path(output_dir)
-    ensure_dir_exists(_output_dir)
-    _output_dir = _output_dir.resolve()
-    _path_to_executable = Path(path_to_executable).resolve()
+    _output_dir = _resolve_output_dir(output_dir)
 
     run_id = token_hex(4)
     tmp_suffix = f"{reneel_run.seed}-{reneel_run.chi}-{run_id}"
@@ -106,15 +183,14 @@ def run_reneel_and_collect_output(path_to_executable,
     input_file = reneel_run.edgelist_file.resolve()
     input_dir = input_file.parent
 
-    partition_file = input_file.with_stem(f"partition_{input_file.stem}")
-    output_partition_file = Path(_output_dir, partition_file.with_stem(f"{partition_file.stem}_{tmp_suffix}").name)
-    results_file = input_file.with_stem(f"results_{input_file.stem}")
-    output_results_file = Path(_output_dir, results_file.with_stem(f"{results_file.stem}_{tmp_suffix}").name)
+    stem, ext = input_file.stem, input_file.suffix
+    partition_file = input_dir / f"partition_{stem}{ext}"
+    output_partition_file = _output_dir / f"partition_{stem}_{tmp_suffix}{ext}"
+    results_file = input_dir / f"results_{stem}{ext}"
+    output_results_file = _output_dir / f"results_{stem}_{tmp_suffix}{ext}"
 
-    cmd = [_path_to_executable, reneel_run.rg_parameter, rg_ensemble_per_cpu, reneel_ensemble_per_cpu, reneel_run.seed, reneel_run.chi, input_file.name]
-    if test_mode:
-        cmd = ['echo'] + cmd
-    cmd = list(map(str, cmd))
+    cmd = [*_command_prefix(path_to_executable, reneel_run.rg_parameter, test_mode),
+           str(rg_ensemble_per_cpu), str(reneel_ensemble_per_cpu), str(reneel_run.seed), str(reneel_run.chi), input_file.name]
     logging.debug(f"Input directory: {input_dir}\ncmd: {' '.join(cmd)}")
 
     if test_mode:
@@ -123,15 +199,16 @@ def run_reneel_and_collect_output(path_to_executable,
         with open(results_file, "a") as rf:
             print("Testing", reneel_run.seed, reneel_run.chi, file=rf)
 
-    os.chdir(input_dir)
+    # cwd= rather than os.chdir, which would change the directory of the whole process
     t_start = time.perf_counter()
-    reneel_run.completed_process = subprocess.run(cmd)
+    reneel_run.completed_process = yield cmd, input_dir, _child_env(n_cpu)
     t_end = time.perf_counter()
     reneel_run.wall_time = t_end - t_start
-    os.chdir(current_dir)
 
     if reneel_run.completed_process.returncode:
         logging.warning(f"Process returned error code {reneel_run.completed_process.returncode}:\n{reneel_run.completed_process}")
+        # there may be no partition file; don't let a FileNotFoundError hide the real failure
+        return reneel_run
 
     logging.debug(f"Moving {partition_file} to {output_partition_file}")
     shutil.move(partition_file, output_partition_file)
@@ -142,19 +219,192 @@ def run_reneel_and_collect_output(path_to_executable,
     reneel_run.partition_file = output_partition_file
     if keep_results:
         reneel_run.results_file = output_results_file
-    return None
+    return reneel_run
+
+
+def _run_steps(steps):
+    """Drive the generator `steps` (`_reneel_steps` or `_reneel_steps_with_temp`) to the end,
+    running reneel with `subprocess.run`, and return its result"""
+    try:
+        cmd, cwd, env = next(steps)
+        steps.send(_run_subprocess_sync(cmd, cwd=cwd, env=env))
+    except StopIteration as done:
+        return done.value
+    finally:
+        # if reneel couldn't be started, this still cleans up e.g. a temporary directory
+        steps.close()
+
+
+async def _run_steps_async(steps):
+    """Coroutine version of `_run_steps`, running reneel with `_run_subprocess`"""
+    try:
+        cmd, cwd, env = next(steps)
+        steps.send(await _run_subprocess(cmd, cwd=cwd, env=env))
+    except StopIteration as done:
+        return done.value
+    finally:
+        steps.close()
+
+
+def _child_streams():
+    """Standard streams for a reneel process: it gets no stdin, its stdout is discarded unless
+    logging at debug level (so parallel runs don't interleave on the terminal), and its stderr
+    is captured so it ends up in the warning and log record if the run fails"""
+    stdout = None if logging.getLogger().isEnabledFor(logging.DEBUG) else subprocess.DEVNULL
+    return dict(stdin=subprocess.DEVNULL, stdout=stdout, stderr=subprocess.PIPE)
+
+
+def _child_env(n_cpu):
+    """Environment for a reneel process using `n_cpu` processors. reneel is parallelised with
+    OpenMP, which otherwise starts a thread per core in every process, oversubscribing the
+    machine when several runs share it (see --nparallel)"""
+    return {**os.environ, "OMP_NUM_THREADS": str(n_cpu)}
+
+
+def _run_subprocess_sync(cmd, cwd=None, env=None):
+    """`subprocess.run(cmd, cwd=cwd, env=env)` with the streams from `_child_streams`"""
+    completed = subprocess.run(cmd, cwd=cwd, env=env, close_fds=True, **_child_streams())
+    return subprocess.CompletedProcess(cmd, completed.returncode, stderr=completed.stderr.decode(errors="replace"))
+
+
+async def _run_subprocess(cmd, cwd=None, env=None):
+    """Asynchronous version of `_run_subprocess_sync`, returning a `CompletedProcess`"""
+    proc = await asyncio.create_subprocess_exec(*cmd, cwd=cwd, env=env, close_fds=True, **_child_streams())
+    _, stderr = await proc.communicate()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stderr=stderr.decode(errors="replace"))
+
+
+async def _gate(coros, limit):
+    """Run the coroutines `coros` with at most `limit` of them running at the same time,
+    yielding their results in the order they finish. They are started in the order given."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def gated(coro):
+        async with semaphore:
+            return await coro
+
+    # tasks (rather than passing the coroutines to as_completed, which puts them in a set)
+    # so they queue on the semaphore in order
+    tasks = [asyncio.create_task(gated(coro)) for coro in coros]
+    for next_done in asyncio.as_completed(tasks):
+        yield await next_done
+
+
+def _link_or_copy(src, dest_dir):
+    """Make `src` available in `dest_dir` under the same name: symlink it if possible,
+    otherwise hardlink it, and only copy it as a last resort"""
+    src = Path(src).resolve()
+    dest = Path(dest_dir, src.name)
+    try:
+        os.symlink(src, dest)
+        return
+    except OSError as ex:
+        logging.debug(f"Could not symlink {src} into {dest_dir} ({ex}); trying a hardlink")
+    try:
+        os.link(src, dest)
+        return
+    except OSError as ex:
+        logging.debug(f"Could not hardlink {src} into {dest_dir} ({ex}); copying")
+    _fast_copy(src, dest)
+
+
+_COPY_BUFSIZE = 128 * 1024
+
+
+def _fast_copy(src, dest):
+    """Copy the contents of `src` to `dest` with `os.sendfile` (which keeps the data in the
+    kernel), falling back to a buffered copy with 128 KiB reads"""
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        if hasattr(os, "sendfile"):
+            try:
+                size = os.fstat(fsrc.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(fdest.fileno(), fsrc.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError as ex:
+                logging.debug(f"sendfile copy of {src} failed ({ex}); falling back to a buffered copy")
+                fsrc.seek(0)
+                fdest.seek(0)
+                fdest.truncate()
+        shutil.copyfileobj(fsrc, fdest, length=_COPY_BUFSIZE)
+
+
+def _collect_output(src, dest):
+    """Move an output file out of a temporary directory: a rename if `src` and `dest`
+    are on the same filesystem, otherwise a copy followed by removing `src`
+    (the directory may be reused by the next run)"""
+    try:
+        os.replace(src, dest)
+    except OSError as ex:
+        logging.debug(f"Could not rename {src} to {dest} ({ex}); copying")
+        _fast_copy(src, dest)
+        os.remove(src)
+
+
+def _remove_if_exists(*files):
+    """Remove each of `files`, ignoring those that don't exist"""
+    for file in files:
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+
+
+def _default_tmpdir():
+    """$TMPDIR if set, else /dev/shm (in memory) if it exists, else the current directory"""
+    return os.environ.get("TMPDIR", "/dev/shm" if os.path.isdir("/dev/shm") else os.getcwd())
 
 
 def run_reneel_and_collect_output_with_temp(path_to_executable,
                                             output_dir,
                                             reneel_run: ReneelRun,
                                             keep_results=False, test_mode=False,
-                                            n_cpu=os.cpu_count()):
-    """Create a temporary directory, copy the input files there, then run reneel.
+                                            n_cpu=_ncpu(),
+                                            tmpdir=None, workdir=None, staged=None):
+    """Create a temporary directory (inside `tmpdir`, or the current directory if None),
+    link the input files there, then run reneel.
+
+    Alternatively, pass an existing `workdir` that is reused across runs (one at a time),
+    along with a dict `staged` of the input files already linked into it (name -> source),
+    so each input is only staged once per sweep.
+
+    Unlike `run_reneel_and_collect_output`, reneel writes its outputs away from the
+    input directory, so this is the version used when running several instances of
+    reneel in parallel, each with its own working directory. Anything the run leaves
+    in the working directory (e.g. after an error, or an unkept results_ file) is
+    removed, so the next run there starts clean.
+
+    Returns the updated `reneel_run`.
+    """
+    return _run_steps(_reneel_steps_with_temp(path_to_executable, output_dir, reneel_run,
+                                              keep_results=keep_results, test_mode=test_mode, n_cpu=n_cpu,
+                                              tmpdir=tmpdir, workdir=workdir, staged=staged))
+
+
+async def run_reneel_and_collect_output_with_temp_async(path_to_executable,
+                                                        output_dir,
+                                                        reneel_run: ReneelRun,
+                                                        keep_results=False, test_mode=False,
+                                                        n_cpu=_ncpu(),
+                                                        tmpdir=None, workdir=None, staged=None):
+    """Coroutine version of `run_reneel_and_collect_output_with_temp`.
 
-    Kept for backward compatibility. For large input files prefer
-    run_reneel_and_collect_output, which avoids copying input data.
+    Returns the updated `reneel_run`.
     """
+    return await _run_steps_async(_reneel_steps_with_temp(path_to_executable, output_dir, reneel_run,
+                                                          keep_results=keep_results, test_mode=test_mode, n_cpu=n_cpu,
+                                                          tmpdir=tmpdir, workdir=workdir, staged=staged))
+
+
+def _reneel_steps_with_temp(path_to_executable, output_dir, reneel_run: ReneelRun,
+                            keep_results=False, test_mode=False, n_cpu=_ncpu(),
+                            tmpdir=None, workdir=None, staged=None):
+    """The body of `run_reneel_and_collect_output_with_temp` and its coroutine version,
+    as a generator in the same way as `_reneel_steps`"""
     rg_ensemble_per_cpu = max(reneel_run.rg_ensemble_size // n_cpu, 1)
     if rg_ensemble_per_cpu * n_cpu != reneel_run.rg_ensemble_size:
         logging.warning(f"Using rg ensemble size {rg_ensemble_per_cpu * n_cpu}; expected {reneel_run.rg_ensemble_size} but {n_cpu = }")
@@ -163,59 +413,81 @@ def run_reneel_and_collect_output_with_temp(path_to_executable,
         logging.warning(f"Using reneel iteration size {reneel_ensemble_per_cpu * n_cpu}; expected {reneel_run.reneel_ensemble_size} but {n_cpu = }")
 
     current_dir = os.getcwd()
-    _output_dir = Path(output_dir)
-    ensure_dir_exists(_output_dir)
-    _output_dir = _output_dir.resolve()
-    _path_to_executable = Path(path_to_executable).resolve()
-    with TemporaryDirectory(dir=current_dir) as tmpdir:
-        logging.debug(f"Created temporary directory {tmpdir}")
-        tmp_suffix = f"{reneel_run.seed}-{reneel_run.chi}-{Path(tmpdir).parts[-1]}"
-        shutil.copy(reneel_run.edgelist_file, tmpdir)
-        for file in reneel_run.associated_files:
-            shutil.copy(file, tmpdir)
-        os.chdir(tmpdir)
-        _input_file = Path(tmpdir, reneel_run.edgelist_file.name).resolve()
-        partition_file = _input_file.with_stem(f"partition_{_input_file.stem}")
-        output_partition_file = Path(_output_dir, partition_file.with_stem(f"{partition_file.stem}_{tmp_suffix}").name)
-        results_file = _input_file.with_stem(f"results_{_input_file.stem}")
-        output_results_file = Path(_output_dir, results_file.with_stem(f"{results_file.stem}_{tmp_suffix}").name)
-
-        cmd = [_path_to_executable, reneel_run.rg_parameter, rg_ensemble_per_cpu, reneel_ensemble_per_cpu, reneel_run.seed, reneel_run.chi, _input_file.name]
-        if test_mode:
-            cmd = ['echo'] + cmd
-        cmd = list(map(str, cmd))
-        logging.debug(f"Current directory: {os.getcwd()}\ncmd: {' '.join(cmd)}")
+    _output_dir = _resolve_output_dir(output_dir)
+    if workdir is None:
+        run_dir = TemporaryDirectory(dir=current_dir if tmpdir is None else tmpdir)
+        staged = {}
+    else:
+        run_dir = nullcontext(workdir)
+        staged = {} if staged is None else staged
+    with run_dir as tmpdir:
+        if workdir is None:
+            logging.debug(f"Created temporary directory {tmpdir}")
+            run_id = Path(tmpdir).parts[-1]
+        else:
+            run_id = token_hex(4)
+        tmp_suffix = f"{reneel_run.seed}-{reneel_run.chi}-{run_id}"
+        # reneel only reads the inputs, so links are enough; only its (small) outputs are copied back
+        for file in [reneel_run.edgelist_file, *reneel_run.associated_files]:
+            source = file.resolve()
+            if staged.get(file.name) == source:
+                continue
+            if file.name in staged:
+                # a different file with the same name; don't write through the old link
+                os.remove(Path(tmpdir, file.name))
+            _link_or_copy(source, tmpdir)
+            staged[file.name] = source
+        # absolute() rather than resolve(): the input is a symlink back to the original file
+        _input_file = Path(tmpdir, reneel_run.edgelist_file.name).absolute()
+        stem, ext = _input_file.stem, _input_file.suffix
+        partition_file = _input_file.parent / f"partition_{stem}{ext}"
+        output_partition_file = _output_dir / f"partition_{stem}_{tmp_suffix}{ext}"
+        results_file = _input_file.parent / f"results_{stem}{ext}"
+        output_results_file = _output_dir / f"results_{stem}_{tmp_suffix}{ext}"
+
+        cmd = [*_command_prefix(path_to_executable, reneel_run.rg_parameter, test_mode),
+               str(rg_ensemble_per_cpu), str(reneel_ensemble_per_cpu), str(reneel_run.seed), str(reneel_run.chi), _input_file.name]
+        logging.debug(f"Working directory: {tmpdir}\ncmd: {' '.join(cmd)}")
         if test_mode:
             with open(partition_file, "a") as pf:
                 print("Testing", reneel_run.seed, reneel_run.chi, file=pf)
             with open(results_file, "a") as rf:
                 print("Testing", reneel_run.seed, reneel_run.chi, file=rf)
         t_start = time.perf_counter()
-        reneel_run.completed_process = subprocess.run(cmd)
+        reneel_run.completed_process = yield cmd, tmpdir, _child_env(n_cpu)
         t_end = time.perf_counter()
         reneel_run.wall_time = t_end - t_start
 
         if reneel_run.completed_process.returncode:
             logging.warning(f"Process returned error code {reneel_run.completed_process.returncode}:\n{reneel_run.completed_process}")
+            # there may be no partition file; don't let a FileNotFoundError hide the real failure
+            _remove_if_exists(partition_file, results_file)
+            return reneel_run
 
-        logging.debug(f"Copying {partition_file} to {output_partition_file}")
-        shutil.copy(partition_file, output_partition_file)
+        logging.debug(f"Moving {partition_file} to {output_partition_file}")
+        _collect_output(partition_file, output_partition_file)
         if keep_results:
-            logging.debug(f"Copying {results_file} to {output_results_file}")
-            shutil.copy(results_file, output_results_file)
-        os.chdir(current_dir)
-    reneel_run.partition_file = Path(_output_dir, partition_file.name)
+            logging.debug(f"Moving {results_file} to {output_results_file}")
+            _collect_output(results_file, output_results_file)
+        else:
+            _remove_if_exists(results_file)
+    reneel_run.partition_file = output_partition_file
     if keep_results:
-        reneel_run.results_file = Path(_output_dir, results_file.name)
-    return None
+        reneel_run.results_file = output_results_file
+    return reneel_run
+
 
+# seconds between flushes of the run log during a sweep
+_LOG_FLUSH_INTERVAL = 30
 
 _DEFAULTS = {
     "verbose":              "warn",
     "chi":                  [0.0],
     "nruns":                1,
     "seed":                 None,
-    "nproc":                os.cpu_count(),
+    "nproc":                _ncpu(),
+    "nparallel":            1,
+    "tmpdir":               None,
     "rg_ensemble_size":     10,
     "reneel_ensemble_size": 8,
     "rg_parameter":         2,
@@ -224,10 +496,11 @@ _DEFAULTS = {
     "logfile":              "reneel.log",
     "keepresults":          False,
     "test":                 False,
+    "dry_run":              False,
     "docker":               False,
 }
 _WARNINGS = {
-    "nproc": "set using `os.cpu_count()` which may not give accurate results." 
+    "nproc": "set using the CPUs this process may run on (`os.sched_getaffinity`, or `os.cpu_count()` where that isn't available), which may not give accurate results." 
 }
 
 if __name__ == "__main__":
@@ -238,6 +511,8 @@ if __name__ == "__main__":
                     help="formatted edgelist file (deprecated positional form; use --input instead)")
     ap.add_argument("-t", "--test", action="store_true", default=None,
                     help="Run tests only. Replaces execution of reneel program with echo statement and creates test output files.")
+    ap.add_argument("--dry-run", action="store_true", default=None,
+                    help="Print the chi, seed and file of every run that would be executed, then exit without running anything.")
 
     io_group = ap.add_argument_group("Inputs and outputs", "Control input/output")
     io_group.add_argument("-i", "--input", nargs="*", default=None,
@@ -248,10 +523,12 @@ if __name__ == "__main__":
                     help="Directory to store output. Defaults to current working directory")
     io_group.add_argument("--outputdir", dest="output", default=None, 
                     help="Deprecated alias for --output")
+    io_group.add_argument("--tmpdir", default=None,
+                    help="Where to create the temporary working directory of each parallel run. Defaults to $TMPDIR, or /dev/shm if available")
     io_group.add_argument("-k", "--keepresults", action="store_true", default=None,
                     help="Pass to keep results_[file] from reneel output")
     io_group.add_argument("-l", "--logfile", default=None,
-                    help="Write the CompletedProcess objects to this file")
+                    help="Append a record of each run (as a line of JSON) to this file")
     io_group.add_argument("-v", "--verbose",
                           choices=["debug", "info", "warn", "error", "critical"],
                           default=None,
@@ -273,6 +550,8 @@ if __name__ == "__main__":
                     help="Path to reneel executable. Default is 'a.out'")
     ex_group.add_argument("-p", "--nproc", type=int, default=None,
                     help="Number of processors used")
+    ex_group.add_argument("--nparallel", type=int, default=None,
+                    help="Number of reneel runs to execute at the same time. The processors given by --nproc are split between them. Default 1")
     ex_group.add_argument("-e", "--rg-ensemble-size", type=int, default=None,
                     help="Ensemble size for randomized greedy portion of the algorithm")
     ex_group.add_argument("-f", "--reneel-ensemble-size", type=int, default=None,
@@ -309,15 +588,73 @@ if __name__ == "__main__":
     if args["docker"]:
         remap_paths_for_docker(args, output_dir="/results")
 
+    # fix the seed of every run up front, and log the schedule so the sweep can be reproduced
+    total = len(args["chi"]) * len(args["input"]) * args["nruns"]
+    if args["seed"] is None:
+        seeds = [randbits(32) for _ in range(total)]
+    else:
+        seeds = list(islice(cycle(args["seed"]), total))
+    logging.info(f"Seeds: {seeds}")
+
+    # enumerate the whole sweep up front (this also checks all the input files exist)
+    jobs = [ReneelRun(edgelist_file=file, seed=seed, chi=chi,
+                      rg_ensemble_size=args["rg_ensemble_size"],
+                      reneel_ensemble_size=args["reneel_ensemble_size"],
+                      rg_parameter=args["rg_parameter"])
+            for (chi, file, run_number), seed in zip(product(args["chi"], args["input"], range(args["nruns"])), seeds)]
+    logging.info(f"Prepared {len(jobs)} run(s)")
+    if args["dry_run"]:
+        print("chi\tseed\tfile")
+        for job in jobs:
+            print(f"{job.chi}\t{job.seed}\t{job.edgelist_file}")
+        exit(0)
+
     ensure_dir_exists(Path(args["logfile"]).parent)
 
-    with open(args["logfile"], "a") as logfile:
-        for (chi, file, run_number), seed in zip(product(args["chi"], args["input"], range(args["nruns"])), seed_generator(seeds=args["seed"])):
-            logging.info(f"Iteration {chi}-{file}-{run_number}")
-            reneelrun = ReneelRun(edgelist_file=file, seed=seed, chi=chi,
-                                  rg_ensemble_size=args["rg_ensemble_size"],
-                                  reneel_ensemble_size=args["reneel_ensemble_size"],
-                                  rg_parameter=args["rg_parameter"])
-            run_reneel_and_collect_output(args["reneelpath"], args["output"], reneelrun, args["keepresults"], test_mode=args["test"], n_cpu=args["nproc"])
-            print(f"{datetime.now():%m/%d/%Y %I:%M:%S %p} test = {args['test']}\n",
-                  reneelrun, file=logfile)
\ No newline at end of file
+    nparallel = max(args["nparallel"], 1)
+    # split the processors between the reneel instances running at the same time
+    n_cpu = max(args["nproc"] // nparallel, 1)
+    # runs in the same directory would overwrite each other's partition_ file, so each of
+    # the parallel "lanes" gets its own working directory, shared by the runs in that lane
+    async def run_and_log(sweep_dir=None):
+        workdirs = asyncio.Queue()
+        if sweep_dir is not None:
+            for lane in range(nparallel):
+                lane_dir = Path(sweep_dir, str(lane))
+                os.mkdir(lane_dir)
+                workdirs.put_nowait((lane_dir, {}))
+
+        async def run_job(job):
+            if sweep_dir is None:
+                return await run_reneel_and_collect_output_async(args["reneelpath"], args["output"], job, args["keepresults"],
+                                                                 test_mode=args["test"], n_cpu=n_cpu)
+            workdir, staged = await workdirs.get()
+            try:
+                return await run_reneel_and_collect_output_with_temp_async(args["reneelpath"], args["output"], job, args["keepresults"],
+                                                                           test_mode=args["test"], n_cpu=n_cpu,
+                                                                           workdir=workdir, staged=staged)
+            finally:
+                workdirs.put_nowait((workdir, staged))
+
+        # one JSON record per line, collected in a 1 MiB buffer rather than written per run;
+        # it is also flushed on a timer, so a killed sweep only loses the most recent records
+        with open(args["logfile"], "a", buffering=1 << 20) as logfile:
+            async def flush_periodically():
+                while True:
+                    await asyncio.sleep(_LOG_FLUSH_INTERVAL)
+                    logfile.flush()
+
+            flusher = asyncio.create_task(flush_periodically())
+            try:
+                async for reneelrun in _gate([run_job(job) for job in jobs], nparallel):
+                    record = {"ts": datetime.now().isoformat(), "test": args["test"], **asdict(reneelrun)}
+                    logfile.write(json.dumps(record, default=_json_default) + "\n")
+            finally:
+                flusher.cancel()
+
+    if nparallel == 1:
+        asyncio.run(run_and_log())
+    else:
+        # one temporary directory for the whole sweep, removed once at the end
+        with TemporaryDirectory(dir=args["tmpdir"] or _default_tmpdir()) as sweep_dir:
+            asyncio.run(run_and_log(sweep_dir))
@@ -1,4 +1,14 @@
-from setuptools import setup
+from setuptools import setup, Extension
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # without Cython, format_edgelist uses the python/numpy reader
+    ext_modules = []
+else:
+    ext_modules = cythonize([Extension("reneelutil._format", ["reneelutil/_format.pyx"],
+                                       language="c++", optional=True)],
+                            language_level=3)
 
 if __name__ == "__main__":
-    setup()
+    setup(ext_modules=ext_modules)